@@ -1,6 +1,8 @@
 import streamlit as st
+import uuid
 from src.core.llm_handler import LLMHandler
 from src.copilot.gm_copilot import GMCopilot
+from src.core.sentiment_pipeline import FeedbackSentimentPipeline
 
 # Configuración de la página de Streamlit
 st.set_page_config(page_title="Paradero AI - Copiloto para GM", layout="centered")
@@ -15,8 +17,11 @@ if "llm_handler" not in st.session_state:
         st.error(f"Error de configuración: {e}. Asegúrate de que OPENAI_API_KEY esté en tu archivo .env")
         st.stop() # Detiene la ejecución si no hay API key
 
+if "copilot_session_id" not in st.session_state:
+    st.session_state.copilot_session_id = str(uuid.uuid4())
+
 if "gm_copilot" not in st.session_state:
-    st.session_state.gm_copilot = GMCopilot(st.session_state.llm_handler)
+    st.session_state.gm_copilot = GMCopilot(st.session_state.llm_handler, FeedbackSentimentPipeline())
 
 # --- Interfaz de Usuario ---
 st.title("👨‍💼 Paradero AI - Copiloto Inteligente para Gerentes Generales")
@@ -31,10 +36,14 @@ user_question = st.text_area("Tu pregunta para el Copiloto:", height=100, placeh
 if st.button("Obtener Recomendación"):
     if user_question:
         with st.spinner("Paradero AI está pensando..."):
-            recommendation, suggested_action = st.session_state.gm_copilot.get_recommendation(user_question)
+            recommendation, suggested_action = st.session_state.gm_copilot.get_recommendation(
+                user_question, session_id=st.session_state.copilot_session_id
+            )
         
         st.subheader("💡 Recomendación de Paradero AI:")
         st.write(recommendation)
+        report = st.session_state.gm_copilot.last_prompt_report
+        st.caption(f"Prompt: ~{report['total_prompt_tokens']} tokens ({report['history_messages']} mensajes de historial)")
 
         if suggested_action:
             st.markdown(f"---")
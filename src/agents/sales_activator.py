@@ -1,12 +1,16 @@
 import streamlit as st
 from src.core.llm_handler import LLMHandler
+from src.core.web_crawler import WebCrawler
+from src.core.tracing import Tracer, get_tracer, traced
 import json
 import os
 import pandas as pd # Para un posible uso futuro de datos estructurados
 
 class SalesActivatorAgent:
-    def __init__(self, llm_handler: LLMHandler):
+    def __init__(self, llm_handler: LLMHandler, web_crawler: WebCrawler = None, tracer: Tracer = None):
         self.llm_handler = llm_handler
+        self.web_crawler = web_crawler # Opcional: aterriza el enriquecimiento con el contenido real del sitio
+        self.tracer = tracer or get_tracer()
         self.data_file = "data/processed/enriched_companies.json"
         self._ensure_data_file_exists()
 
@@ -38,46 +42,71 @@ class SalesActivatorAgent:
     def _load_data(self):
         """Carga los datos de empresas."""
         self._ensure_data_file_exists()
-        with open(self.data_file, 'r', encoding='utf-8') as f:
+        with self.tracer.span("load_data"), open(self.data_file, 'r', encoding='utf-8') as f:
             return json.load(f)
 
     def _save_data(self, data):
         """Guarda los datos de empresas."""
-        with open(self.data_file, 'w', encoding='utf-8') as f:
+        with self.tracer.span("save_data", companies=len(data)), open(self.data_file, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
 
-    def enrich_company_data(self, company_name: str, website: str = ""):
+    def fetch_website_contexts(self, websites):
+        """
+        Descarga en paralelo los sitios web de varias empresas antes del enriquecimiento.
+        Retorna {website: texto extraído y recortado}; vacío si no hay crawler configurado.
+        """
+        if not self.web_crawler:
+            return {}
+        with self.tracer.span("fetch_websites"):
+            return self.web_crawler.get_contexts(websites)
+
+    def enrich_company_data(self, company_name: str, website: str = "", website_context: str = None):
         """
         Enriquece la información de una empresa usando el LLM.
+        Si hay crawler (o se pasa website_context ya descargado), incluye el texto del sitio en el prompt.
         """
+        if website_context is None and self.web_crawler and website:
+            with self.tracer.span("fetch_website", website=website):
+                website_context = self.web_crawler.get_context(website)
+
+        site_content = ""
+        if website_context:
+            site_content = (
+                "Contenido extraído del sitio web (úsalo como fuente principal, no inventes datos que lo contradigan):\n"
+                f"\"\"\"{website_context}\"\"\"\n"
+            )
+
         user_prompt = (
             f"Analiza la empresa '{company_name}'. "
             f"Sitio web (si disponible): {website if website else 'No proporcionado'}. "
+            f"{site_content}"
             "Genera un JSON con los siguientes campos, evita listas dentro de listas, usa español: "
             "{'name': 'Nombre de la empresa', 'industry_segment': 'Ej: Tech MICE, Pharma Incentives', "
             "'key_contacts': 'Ej: Head of HR, Event Manager', 'potential_needs': 'Ej: Espacios grandes, catering vegano, actividades de team-building', "
             "'pain_point': 'Ej: Dificultad para encontrar venues con servicio personalizado, falta de flexibilidad'}"
         )
         
-        json_output = self.llm_handler.get_completion(
-            system_prompt=self.system_prompt_enrich,
-            user_prompt=user_prompt,
-            temperature=0.3 # Menor temperatura para datos estructurados
-        )
-        try:
-            # A veces el LLM puede añadir texto antes o después del JSON. Buscamos el JSON.
-            json_start = json_output.find('{')
-            json_end = json_output.rfind('}') + 1
-            if json_start != -1 and json_end != -1:
-                clean_json_output = json_output[json_start:json_end]
-                enriched_data = json.loads(clean_json_output)
-                return enriched_data
-            else:
-                print(f"Advertencia: No se encontró un JSON válido en la respuesta: {json_output}")
+        with self.tracer.span("llm_enrich"):
+            json_output = self.llm_handler.get_completion(
+                system_prompt=self.system_prompt_enrich,
+                user_prompt=user_prompt,
+                temperature=0.3 # Menor temperatura para datos estructurados
+            )
+        with self.tracer.span("extract_json"):
+            try:
+                # A veces el LLM puede añadir texto antes o después del JSON. Buscamos el JSON.
+                json_start = json_output.find('{')
+                json_end = json_output.rfind('}') + 1
+                if json_start != -1 and json_end != -1:
+                    clean_json_output = json_output[json_start:json_end]
+                    enriched_data = json.loads(clean_json_output)
+                    return enriched_data
+                else:
+                    print(f"Advertencia: No se encontró un JSON válido en la respuesta: {json_output}")
+                    return None
+            except json.JSONDecodeError as e:
+                print(f"Error al parsear JSON del LLM: {e}. Respuesta: {json_output}")
                 return None
-        except json.JSONDecodeError as e:
-            print(f"Error al parsear JSON del LLM: {e}. Respuesta: {json_output}")
-            return None
 
     def generate_outbound_sequences(self, company_data: dict):
         """
@@ -93,26 +122,30 @@ class SalesActivatorAgent:
             "Asegúrate de que cada email sea profesional, conciso y adapte el tono de un hotel de lujo."
         )
 
-        sequences = self.llm_handler.get_completion(
-            system_prompt=self.system_prompt_sequence,
-            user_prompt=user_prompt,
-            temperature=0.7 # Mayor temperatura para creatividad en el texto
-        )
+        with self.tracer.span("llm_sequences"):
+            sequences = self.llm_handler.get_completion(
+                system_prompt=self.system_prompt_sequence,
+                user_prompt=user_prompt,
+                temperature=0.7 # Mayor temperatura para creatividad en el texto
+            )
         return sequences
 
-    def process_new_company(self, company_name: str, website: str = ""):
+    @traced("process_new_company", args=("company_name",))
+    def process_new_company(self, company_name: str, website: str = "", website_context: str = None):
         """
         Procesa una nueva empresa de principio a fin.
         """
         current_companies = self._load_data()
         
         # Verificar si la empresa ya existe
-        if any(c['name'].lower() == company_name.lower() for c in current_companies):
+        with self.tracer.span("dedup_scan", companies=len(current_companies)):
+            already_processed = any(c['name'].lower() == company_name.lower() for c in current_companies)
+        if already_processed:
             return False, f"La empresa '{company_name}' ya ha sido procesada."
 
         # Paso 1: Enriquecer datos
         st.info(f"Enriqueciendo datos para {company_name}...")
-        enriched_data = self.enrich_company_data(company_name, website)
+        enriched_data = self.enrich_company_data(company_name, website, website_context)
         
         if not enriched_data:
             return False, f"Fallo al enriquecer datos para {company_name}. Revisa la respuesta del LLM."
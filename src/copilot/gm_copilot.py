@@ -1,9 +1,18 @@
 from src.core.llm_handler import LLMHandler
+from src.core.sentiment_pipeline import FeedbackSentimentPipeline
+from src.core.prompt_budget import ConversationMemory, PromptAssembler, trim_to_token_budget
+from src.core.tracing import Tracer, get_tracer, traced
 import json
 
 class GMCopilot:
-    def __init__(self, llm_handler: LLMHandler):
+    def __init__(self, llm_handler: LLMHandler, sentiment_pipeline: FeedbackSentimentPipeline = None,
+                 conversation_memory: ConversationMemory = None, max_prompt_tokens: int = 6000,
+                 max_sop_tokens: int = 3000, tracer: Tracer = None):
         self.llm_handler = llm_handler
+        self.tracer = tracer or get_tracer()
+        self.sentiment_pipeline = sentiment_pipeline # Opcional: resúmenes en caché del sentimiento del equipo
+        self.conversation_memory = conversation_memory or ConversationMemory()
+        self.last_prompt_report = None # Tokens estimados del último prompt enviado
         self.system_prompt_base = (
             "Eres un copiloto de IA altamente competente para un Gerente General de un hotel de lujo, "
             "Paradero AI. Tu objetivo es proporcionar recomendaciones estratégicas, proactivas y alineadas con la marca, "
@@ -15,6 +24,12 @@ class GMCopilot:
         self.sops = self._load_sops_from_file("data/knowledge_base/sop_hospitality_tone.txt")
         self.morale_templates = self._load_json_data("data/knowledge_base/team_morale_templates.json")
 
+        # Prefijo estático (rol + SOPs): idéntico en cada petición para el caché de prompts del proveedor
+        self.prompt_assembler = PromptAssembler(
+            [self.system_prompt_base, f"SOPs de Paradero y Tono:\n{trim_to_token_budget(self.sops, max_sop_tokens)}"],
+            max_prompt_tokens=max_prompt_tokens
+        )
+
 
     def _load_sops_from_file(self, filepath):
         """Carga los SOPs o el tono de la marca desde un archivo."""
@@ -34,10 +49,12 @@ class GMCopilot:
             print(f"Advertencia: Archivo JSON no encontrado o corrupto en {filepath}. Omitiendo datos.")
             return {}
 
-    def get_recommendation(self, gm_question: str):
+    @traced("get_recommendation", args=("session_id",))
+    def get_recommendation(self, gm_question: str, session_id: str = None):
         """
         Genera una recomendación para el GM basada en su pregunta, los SOPs
-        y la inteligencia del LLM.
+        y la inteligencia del LLM. Con session_id, mantiene el historial de la conversación
+        para preguntas de seguimiento.
         """
         # lógica simple para "aterrizar" la pregunta
         # con información relevante de tus los SOPs o base de conocimiento (simulando RAG)
@@ -46,18 +63,34 @@ class GMCopilot:
             context_info = f"\nConsidera estos principios sobre la moral del equipo de Paradero:\n{self.morale_templates.get('general_morale_principles', '')}"
             if "limpieza" in gm_question.lower():
                 context_info += f"\nEspecíficamente para Housekeeping:\n{self.morale_templates.get('housekeeping_specific', '')}"
+            if self.sentiment_pipeline:
+                # Solo lee los resúmenes ya calculados; la puntuación se hace en lote fuera de la petición
+                with self.tracer.span("sentiment_context"):
+                    measured_morale = self.sentiment_pipeline.get_morale_context(gm_question)
+                if measured_morale:
+                    context_info += f"\n{measured_morale}"
 
-        # Combina el prompt base con los SOPs y la pregunta del GM
-        full_system_prompt = f"{self.system_prompt_base}\n\nSOPs de Paradero y Tono:\n{self.sops}{context_info}"
-        
-        response_content = self.llm_handler.get_completion(
-            system_prompt=full_system_prompt,
-            user_prompt=gm_question,
-            temperature=0.4 # Menor temperatura para respuestas más directas y menos creativas
-        )
+        # Prefijo estático + contexto de la pregunta, con el historial de la sesión dentro del presupuesto
+        with self.tracer.span("build_prompt"):
+            full_system_prompt, history, self.last_prompt_report = self.prompt_assembler.build(
+                gm_question, context_info, self.conversation_memory, session_id
+            )
+
+        with self.tracer.span("llm_completion", prompt_tokens=self.last_prompt_report["total_prompt_tokens"]):
+            response_content = self.llm_handler.get_completion(
+                system_prompt=full_system_prompt,
+                user_prompt=gm_question,
+                temperature=0.4, # Menor temperatura para respuestas más directas y menos creativas
+                history=history
+            )
+
+        # Un error del LLM no se guarda en el historial: arrastraría el mensaje de error a los seguimientos
+        if session_id and response_content != LLMHandler.ERROR_RESPONSE:
+            self.conversation_memory.add_turn(session_id, gm_question, response_content)
         
         # Lógica para sugerir una acción/agente (Bonus)
-        suggested_action = self._suggest_agent_action(response_content, gm_question)
+        with self.tracer.span("suggest_action"):
+            suggested_action = self._suggest_agent_action(response_content, gm_question)
 
         return response_content, suggested_action
 
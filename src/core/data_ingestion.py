@@ -1,9 +1,11 @@
 import pandas as pd
 import os
+from src.core.tracing import Tracer, get_tracer
 
 class DataIngestion:
-    def __init__(self, base_path="data/raw/"):
+    def __init__(self, base_path="data/raw/", tracer: Tracer = None):
         self.base_path = base_path
+        self.tracer = tracer or get_tracer()
 
     def load_simulated_company_leads(self, filename="company_leads.csv"):
         """
@@ -12,7 +14,8 @@ class DataIngestion:
         """
         filepath = os.path.join(self.base_path, filename)
         try:
-            df = pd.read_csv(filepath)
+            with self.tracer.span("parse_csv", file=filename):
+                df = pd.read_csv(filepath)
             return df.to_dict(orient='records') # Retorna lista de diccionarios
         except FileNotFoundError:
             print(f"Advertencia: Archivo de leads no encontrado en {filepath}. Creando uno de ejemplo.")
@@ -6,6 +6,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class LLMHandler:
+    # Respuesta de respaldo cuando falla la llamada al LLM (los llamadores pueden detectarla)
+    ERROR_RESPONSE = "Lo siento, hubo un error al procesar tu solicitud."
+
     def __init__(self, model_name="gpt-4o-mini"):
         # Obtener la API key de las variables de entorno
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -14,7 +17,7 @@ class LLMHandler:
         self.client = OpenAI(api_key=self.api_key)
         self.model_name = model_name
 
-    def get_completion(self, system_prompt: str, user_prompt: str, temperature: float = 0.7):
+    def get_completion(self, system_prompt: str, user_prompt: str, temperature: float = 0.7, history: list = None):
         """
         Obtiene una respuesta del modelo de lenguaje.
 
@@ -22,6 +25,7 @@ class LLMHandler:
             system_prompt (str): Rol e instrucciones para el LLM.
             user_prompt (str): La pregunta o solicitud del usuario.
             temperature (float): Controla la creatividad de la respuesta (0.0 a 1.0).
+            history (list): Mensajes previos de la conversación ({"role", "content"}), opcional.
 
         Returns:
             str: La respuesta generada por el LLM.
@@ -31,6 +35,7 @@ class LLMHandler:
                 model=self.model_name,
                 messages=[
                     {"role": "system", "content": system_prompt},
+                    *(history or []),
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=temperature,
@@ -38,7 +43,7 @@ class LLMHandler:
             return response.choices[0].message.content
         except Exception as e:
             print(f"Error al obtener la respuesta del LLM: {e}")
-            return "Lo siento, hubo un error al procesar tu solicitud."
+            return self.ERROR_RESPONSE
 
 # Ejemplo de uso (puedes ejecutar este archivo directamente para probar el handler)
 if __name__ == "__main__":
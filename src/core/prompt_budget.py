@@ -0,0 +1,173 @@
+import re
+import threading
+
+# Aproximación local a un tokenizador BPE: palabras largas se parten en fragmentos de ~4 caracteres
+# y cada signo de puntuación cuenta como un token.
+_TOKEN_PATTERN = re.compile(r"\.\.\.|\w+|[^\w\s]")
+ELLIPSIS = " ..."
+SUMMARY_HEADER = "Resumen de la conversación previa con el GM:\n"
+
+
+def _word_tokens(piece: str) -> int:
+    return max(1, (len(piece) + 3) // 4)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación local de tokens, sin llamar a la API."""
+    if not text:
+        return 0
+    return sum(_word_tokens(piece) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def trim_to_token_budget(text: str, max_tokens: int) -> str:
+    """Recorta el texto por palabras para que no supere el presupuesto de tokens (incluida la elipsis final)."""
+    if max_tokens <= 0 or not text:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - 1 # Reservado para la elipsis
+    used = 0
+    end = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        used += _word_tokens(match.group())
+        if used > budget:
+            break
+        end = match.end()
+    return text[:end].rstrip() + ELLIPSIS
+
+
+class ConversationMemory:
+    """
+    Historial multi-turno por sesión acotado a un presupuesto de tokens. Cuando se supera,
+    los turnos más antiguos se compactan en un resumen breve (local, sin llamadas extra al LLM);
+    un turno nunca se descarta sin pasar antes por el resumen.
+    """
+
+    def __init__(self, max_history_tokens=1500, summary_tokens=300, max_sessions=500):
+        self.max_history_tokens = max_history_tokens
+        self.summary_tokens = summary_tokens
+        self.max_sessions = max_sessions
+        self._sessions = {} # session_id -> {"summary": str, "turns": [(pregunta, respuesta)]}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _turn_tokens(turn) -> int:
+        question, answer = turn
+        return estimate_tokens(question) + estimate_tokens(answer)
+
+    @staticmethod
+    def _compact_turn(turn) -> str:
+        """Resumen de una línea: la pregunta del GM y la primera frase de la respuesta."""
+        question, answer = turn
+        first_sentence = re.split(r"(?<=[.!?])\s", answer.strip(), maxsplit=1)[0]
+        return f"- GM: {trim_to_token_budget(question, 40)} | Copiloto: {trim_to_token_budget(first_sentence, 60)}"
+
+    @staticmethod
+    def _fit_summary(lines, budget: int) -> str:
+        """Las líneas más recientes del resumen que caben, con su encabezado, en budget tokens."""
+        lines = list(lines)
+        while lines and estimate_tokens(SUMMARY_HEADER + "\n".join(lines)) > budget:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def _fit_turn(self, question: str, answer: str):
+        """Recorta un turno que por sí solo no dejaría sitio al resumen dentro del presupuesto."""
+        budget = max(self.max_history_tokens - self.summary_tokens, self.max_history_tokens // 2)
+        question = trim_to_token_budget(question, budget // 2)
+        return question, trim_to_token_budget(answer, budget - estimate_tokens(question))
+
+    def _history_tokens(self, session) -> int:
+        summary_tokens = estimate_tokens(SUMMARY_HEADER + session["summary"]) if session["summary"] else 0
+        return summary_tokens + sum(self._turn_tokens(t) for t in session["turns"])
+
+    def add_turn(self, session_id: str, question: str, answer: str):
+        with self._lock:
+            session = self._sessions.pop(session_id, None) or {"summary": "", "turns": []}
+            self._sessions[session_id] = session # Reinsertar para mantener orden LRU
+            session["turns"].append(self._fit_turn(question, answer))
+
+            while self._history_tokens(session) > self.max_history_tokens and len(session["turns"]) > 1:
+                oldest = session["turns"].pop(0)
+                lines = session["summary"].splitlines() + [self._compact_turn(oldest)]
+                session["summary"] = self._fit_summary(lines, self.summary_tokens)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.pop(next(iter(self._sessions)))
+
+    def get_messages(self, session_id: str, max_tokens: int = None) -> list:
+        """
+        Mensajes de historial (formato chat) para la sesión: los turnos más nuevos que quepan completos
+        en max_tokens y, antes, el resumen de todos los anteriores (incluidos los que no caben completos).
+        """
+        budget = self.max_history_tokens if max_tokens is None else min(max_tokens, self.max_history_tokens)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if not session or budget <= 0:
+                return []
+            summary = session["summary"]
+            turns = list(session["turns"])
+
+        start = len(turns) # Primer turno que va completo
+        used = 0
+        while start > 0 and used + self._turn_tokens(turns[start - 1]) <= budget:
+            start -= 1
+            used += self._turn_tokens(turns[start])
+
+        # Los turnos que no caben completos pasan al resumen, para no dejar huecos en la conversación.
+        # Si no queda sitio para ninguna línea, el turno completo más antiguo cede su espacio.
+        lines = summary.splitlines() + [self._compact_turn(t) for t in turns[:start]]
+        summary_text = self._fit_summary(lines, budget - used)
+        while lines and not summary_text and start < len(turns) - 1:
+            lines.append(self._compact_turn(turns[start]))
+            used -= self._turn_tokens(turns[start])
+            start += 1
+            summary_text = self._fit_summary(lines, budget - used)
+
+        messages = [{"role": "system", "content": SUMMARY_HEADER + summary_text}] if summary_text else []
+        for question, answer in turns[start:]:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class PromptAssembler:
+    """
+    Ensambla el prompt por secciones. El prefijo estático (rol, SOPs) va siempre primero y sin cambios
+    para aprovechar el caché de prompts del proveedor; el contexto dinámico, el historial y la pregunta
+    van después. Reporta los tokens estimados de cada sección.
+    """
+
+    def __init__(self, static_sections, max_prompt_tokens=6000):
+        self.static_prefix = "\n\n".join(s for s in static_sections if s)
+        self.static_tokens = estimate_tokens(self.static_prefix)
+        self.max_prompt_tokens = max_prompt_tokens
+
+    def build(self, question: str, dynamic_context: str = "", memory: ConversationMemory = None,
+              session_id: str = None):
+        """
+        Retorna (system_prompt, history_messages, report). El historial se limita al presupuesto
+        que queda tras el prefijo estático, el contexto dinámico y la pregunta.
+        """
+        system_prompt = f"{self.static_prefix}{dynamic_context}"
+        dynamic_tokens = estimate_tokens(dynamic_context)
+        question_tokens = estimate_tokens(question)
+
+        history = []
+        if memory and session_id:
+            remaining = self.max_prompt_tokens - self.static_tokens - dynamic_tokens - question_tokens
+            history = memory.get_messages(session_id, max_tokens=remaining)
+        history_tokens = sum(estimate_tokens(m["content"]) for m in history)
+
+        report = {
+            "static_prefix_tokens": self.static_tokens,
+            "dynamic_context_tokens": dynamic_tokens,
+            "history_tokens": history_tokens,
+            "history_messages": len(history),
+            "question_tokens": question_tokens,
+            "total_prompt_tokens": self.static_tokens + dynamic_tokens + history_tokens + question_tokens,
+        }
+        return system_prompt, history, report
@@ -0,0 +1,362 @@
+import csv
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from textblob import TextBlob
+
+# Columnas aceptadas en los exports de encuestas / notas de 1:1
+TEXT_COLUMNS = ("feedback", "comment", "comentario", "text", "texto", "nota")
+DEPARTMENT_COLUMNS = ("department", "departamento", "area")
+SHIFT_COLUMNS = ("shift", "turno")
+DEFAULT_DEPARTMENT = "General"
+NEGATIVE_THRESHOLD = -0.1
+# utf-8-sig descarta el BOM que añade Excel; si el archivo no es UTF-8 se relee como Windows-1252
+ENCODING = "utf-8-sig"
+FALLBACK_ENCODING = "cp1252"
+
+# Léxico de sentimiento en español (raíces sin tildes -> polaridad). El analizador por defecto de
+# TextBlob solo entiende inglés y puntúa el feedback en español como neutro (0.0).
+SPANISH_LEXICON = {
+    # Negativos
+    "pesim": -1.0, "horribl": -1.0, "terribl": -1.0, "fatal": -0.9, "odio": -0.9, "odia": -0.9, "injust": -0.8,
+    "agotad": -0.7, "cansad": -0.6, "estresad": -0.7, "estres": -0.6, "quem": -0.5, "desmotivad": -0.8,
+    "frustrad": -0.8, "frustra": -0.7, "molest": -0.6, "enojad": -0.7, "harto": -0.8, "harta": -0.8,
+    "triste": -0.6, "mal": -0.6, "malestar": -0.6, "malo": -0.7, "mala": -0.7, "peor": -0.8, "deficient": -0.7,
+    "insuficient": -0.5, "problema": -0.4, "queja": -0.5, "abus": -0.9, "maltrat": -1.0, "grit": -0.7,
+    "ignorad": -0.7, "olvidad": -0.5, "desorganizad": -0.6, "caos": -0.7, "caotic": -0.7, "sobrecarg": -0.7,
+    "exces": -0.4, "dificil": -0.4, "inseguro": -0.5, "incomod": -0.5, "dolor": -0.5, "renunci": -0.6,
+    "falta": -0.4, "escas": -0.4, "nunca": -0.3, "desagradabl": -0.7, "lamentabl": -0.8, "toxic": -0.9,
+    # Positivos
+    "excelent": 1.0, "exceptional": 1.0, "genial": 0.9, "fantastic": 0.9, "maravillos": 0.9,
+    "content": 0.8, "feliz": 0.8, "felices": 0.8, "alegr": 0.7, "orgullos": 0.8, "motivad": 0.8,
+    "agradecid": 0.8, "gracias": 0.5, "bien": 0.5, "buen": 0.6, "buena": 0.6, "bueno": 0.6, "mejor": 0.6,
+    "apoy": 0.5, "reconocimiento": 0.6, "reconoc": 0.5, "justo": 0.5, "comod": 0.5, "tranquil": 0.4,
+    "positiv": 0.6, "amabl": 0.6, "respet": 0.5, "valorad": 0.7, "escuchad": 0.6,
+    "organizad": 0.5, "claro": 0.3, "satisfech": 0.8, "encant": 0.9, "perfect": 0.9, "increibl": 0.9,
+}
+NEGATIONS = {"no", "nunca", "ni", "tampoco", "sin", "jamas"}
+INTENSIFIERS = {"muy": 1.3, "super": 1.4, "demasiado": 1.3, "bastante": 1.2, "totalmente": 1.4, "poco": 0.5}
+_WORD_PATTERN = re.compile(r"[a-zñ]+")
+# Superlativos (-ísimo) y diminutivos (-ito, -cito, -illo) se reducen a su raíz antes de buscarla
+_SUPERLATIVE_PATTERN = re.compile(r"isim(?:os|as|o|a)$")
+_DIMINUTIVE_PATTERN = re.compile(r"(?:ecit|cit|it|ill)(?:os|as|o|a)$")
+SUPERLATIVE_FACTOR = 1.3
+MIN_PREFIX_STEM = 4 # Raíces más cortas ("mal") solo coinciden con la palabra exacta, no con "maleta"
+MAX_INFLECTION = 4
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def _stem_score(word: str):
+    """Polaridad de la raíz más larga del léxico que coincide con la palabra (tolera flexiones)."""
+    if word in SPANISH_LEXICON:
+        return SPANISH_LEXICON[word]
+    for end in range(len(word) - 1, max(MIN_PREFIX_STEM, len(word) - MAX_INFLECTION) - 1, -1):
+        stem = word[:end]
+        if stem in SPANISH_LEXICON:
+            return SPANISH_LEXICON[stem]
+    return None
+
+
+def _lexicon_score(word: str):
+    """Polaridad de la palabra; si no está en el léxico, prueba sin sufijo superlativo o diminutivo."""
+    score = _stem_score(word)
+    if score is not None:
+        return score
+    for pattern, factor in ((_SUPERLATIVE_PATTERN, SUPERLATIVE_FACTOR), (_DIMINUTIVE_PATTERN, 1.0)):
+        base = pattern.sub("", word)
+        if base != word:
+            score = _stem_score(base)
+            if score is not None:
+                return score * factor
+    return None
+
+
+def spanish_sentiment(text: str):
+    """
+    Analizador léxico para español con negación ("no", "sin", ...) e intensificadores ("muy", ...).
+    Retorna (polaridad en [-1, 1], subjetividad en [0, 1]).
+    """
+    words = _WORD_PATTERN.findall(_strip_accents(text.lower()))
+    scores = []
+    negate_window = 0
+    intensity = 1.0
+    for word in words:
+        if word in NEGATIONS and word != "nunca":
+            negate_window = 3
+            continue
+        if word in INTENSIFIERS:
+            intensity = INTENSIFIERS[word]
+            continue
+        score = _lexicon_score(word)
+        if score is not None:
+            if negate_window:
+                score = -score * 0.7
+            scores.append(max(-1.0, min(1.0, score * intensity)))
+        intensity = 1.0
+        negate_window = max(0, negate_window - 1)
+    if not scores:
+        return 0.0, 0.0
+    return sum(scores) / len(scores), min(1.0, 2 * len(scores) / len(words))
+
+
+def english_sentiment(text: str):
+    """Analizador por defecto de TextBlob (PatternAnalyzer), válido solo para feedback en inglés."""
+    sentiment = TextBlob(text).sentiment
+    return sentiment.polarity, sentiment.subjectivity
+
+
+ANALYZERS = {"es": spanish_sentiment, "en": english_sentiment}
+
+
+def _score_batch(batch, language="es"):
+    """
+    Puntúa un lote de feedback en un proceso del pool y retorna agregados parciales,
+    para no devolver al proceso principal un resultado por cada fila.
+    """
+    analyze = ANALYZERS[language]
+    partial = {}
+    for department, shift, text in batch:
+        polarity, subjectivity = analyze(text)
+        group = partial.setdefault((department, shift), [0, 0.0, 0.0, 0])
+        group[0] += 1
+        group[1] += polarity
+        group[2] += subjectivity
+        if polarity < NEGATIVE_THRESHOLD:
+            group[3] += 1
+    return partial
+
+
+def _pick(row: dict, candidates, default=""):
+    for column in candidates:
+        value = row.get(column)
+        if value:
+            return str(value).strip()
+    return default
+
+
+class FeedbackSentimentPipeline:
+    """
+    Pipeline en lote que puntúa el sentimiento del feedback anónimo del equipo (exports de encuestas,
+    notas de 1:1) en un pool de procesos, lo agrega por departamento y turno y guarda resúmenes en
+    caché para que el copiloto los use sin volver a puntuar en cada pregunta.
+    El idioma elige el analizador: "es" (léxico en español, por defecto) o "en" (TextBlob).
+    """
+
+    def __init__(self, summary_file="data/processed/team_sentiment_summary.json",
+                 batch_size=500, max_workers=None, language="es"):
+        if language not in ANALYZERS:
+            raise ValueError(f"Idioma de sentimiento no soportado: {language}. Usa uno de {sorted(ANALYZERS)}.")
+        self.summary_file = summary_file
+        self.language = language
+        self.batch_size = batch_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._summaries = None # Caché en memoria de los resúmenes guardados en disco
+        self._summaries_mtime = None
+
+    def _iter_records(self, filepath, encoding=ENCODING):
+        """Lee el archivo fila a fila (CSV, JSONL o texto plano) sin cargarlo entero en memoria."""
+        extension = os.path.splitext(filepath)[1].lower()
+        errors = "strict" if encoding == ENCODING else "replace"
+        with open(filepath, 'r', encoding=encoding, errors=errors, newline='') as f:
+            if extension == ".csv":
+                for row in csv.DictReader(f):
+                    row = {(k or "").strip().lower(): v for k, v in row.items()}
+                    yield _pick(row, DEPARTMENT_COLUMNS, DEFAULT_DEPARTMENT), _pick(row, SHIFT_COLUMNS, "N/A"), _pick(row, TEXT_COLUMNS)
+            elif extension in (".jsonl", ".ndjson"):
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        row = {k.lower(): v for k, v in json.loads(line).items()}
+                    except (json.JSONDecodeError, AttributeError):
+                        print(f"Advertencia: Línea {line_number} inválida en {filepath}. Omitiendo.")
+                        continue
+                    yield _pick(row, DEPARTMENT_COLUMNS, DEFAULT_DEPARTMENT), _pick(row, SHIFT_COLUMNS, "N/A"), _pick(row, TEXT_COLUMNS)
+            else:
+                for line in f:
+                    yield DEFAULT_DEPARTMENT, "N/A", line.strip()
+
+    def _iter_batches(self, filepath, encoding=ENCODING):
+        batch = []
+        for department, shift, text in self._iter_records(filepath, encoding):
+            if not text:
+                continue
+            batch.append((department, shift, text))
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _merge(totals: dict, partial: dict):
+        for key, (count, polarity, subjectivity, negatives) in partial.items():
+            group = totals.setdefault(key, [0, 0.0, 0.0, 0])
+            group[0] += count
+            group[1] += polarity
+            group[2] += subjectivity
+            group[3] += negatives
+
+    def _score_batches(self, filepath, encoding=ENCODING) -> dict:
+        """Reparte los lotes en el pool manteniendo acotado el número de lotes en vuelo."""
+        totals = {}
+        if self.max_workers <= 1:
+            for batch in self._iter_batches(filepath, encoding):
+                self._merge(totals, _score_batch(batch, self.language))
+            return totals
+
+        max_in_flight = self.max_workers * 2
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            for batch in self._iter_batches(filepath, encoding):
+                pending.add(executor.submit(_score_batch, batch, self.language))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._merge(totals, future.result())
+            for future in pending:
+                self._merge(totals, future.result())
+        return totals
+
+    @staticmethod
+    def _fingerprint(filepath) -> dict:
+        stat = os.stat(filepath)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    @staticmethod
+    def _group_stats(count, polarity, subjectivity, negatives) -> dict:
+        """Promedios redondeados para mostrar, junto a los totales sin redondear para agregar entre archivos."""
+        return {
+            "count": count,
+            "avg_polarity": round(polarity / count, 3) if count else 0.0,
+            "avg_subjectivity": round(subjectivity / count, 3) if count else 0.0,
+            "negative_share": round(negatives / count, 3) if count else 0.0,
+            "polarity_sum": polarity,
+            "subjectivity_sum": subjectivity,
+            "negatives": negatives,
+        }
+
+    def _load_summaries(self) -> dict:
+        """Lee los resúmenes de disco solo si el archivo cambió (p. ej. tras una ejecución en lote)."""
+        try:
+            mtime = os.path.getmtime(self.summary_file)
+        except OSError:
+            mtime = None
+        if self._summaries is None or mtime != self._summaries_mtime:
+            try:
+                with open(self.summary_file, 'r', encoding='utf-8') as f:
+                    self._summaries = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._summaries = {}
+            self._summaries_mtime = mtime
+        return self._summaries
+
+    def _save_summaries(self):
+        os.makedirs(os.path.dirname(self.summary_file), exist_ok=True)
+        with open(self.summary_file, 'w', encoding='utf-8') as f:
+            json.dump(self._summaries, f, ensure_ascii=False, indent=4)
+        self._summaries_mtime = os.path.getmtime(self.summary_file)
+
+    def score_file(self, filepath, force=False) -> dict:
+        """
+        Puntúa un archivo de feedback y guarda su resumen. Si el archivo no cambió desde la última
+        ejecución (mismo tamaño y fecha de modificación), retorna el resumen en caché.
+        """
+        source = os.path.abspath(filepath)
+        fingerprint = self._fingerprint(source)
+        summaries = self._load_summaries()
+        cached = summaries.get(source)
+        if (cached and not force and cached.get("fingerprint") == fingerprint
+                and cached.get("language") == self.language):
+            return cached
+
+        try:
+            totals = self._score_batches(source)
+        except UnicodeDecodeError:
+            print(f"Advertencia: {source} no está en UTF-8. Se lee como {FALLBACK_ENCODING}.")
+            totals = self._score_batches(source, FALLBACK_ENCODING)
+        overall = [0, 0.0, 0.0, 0]
+        groups = []
+        for (department, shift), values in sorted(totals.items()):
+            groups.append({"department": department, "shift": shift, **self._group_stats(*values)})
+            overall = [a + b for a, b in zip(overall, values)]
+
+        summary = {
+            "source": source,
+            "fingerprint": fingerprint,
+            "language": self.language,
+            "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "overall": self._group_stats(*overall),
+            "groups": groups,
+        }
+        summaries[source] = summary
+        self._save_summaries()
+        return summary
+
+    def get_summaries(self) -> list:
+        """
+        Resúmenes en caché de los archivos puntuados, sin volver a puntuar. Se omiten los de archivos
+        que ya no existen, para que exports antiguos borrados no sigan apareciendo en el prompt.
+        """
+        return [s for s in self._load_summaries().values() if os.path.exists(s.get("source", ""))]
+
+    def get_groups(self) -> list:
+        """Agrega los grupos de todos los resúmenes vigentes: una sola entrada por (departamento, turno)."""
+        totals = {}
+        for summary in self.get_summaries():
+            for g in summary.get("groups", []):
+                self._merge(totals, {(g["department"], g["shift"]): (
+                    g["count"], g["polarity_sum"], g["subjectivity_sum"], g["negatives"]
+                )})
+        return [
+            {"department": department, "shift": shift, **self._group_stats(*values)}
+            for (department, shift), values in sorted(totals.items())
+        ]
+
+    def get_morale_context(self, department_hint: str = None, max_groups: int = 5) -> str:
+        """
+        Texto breve para el prompt del copiloto con los grupos (departamento/turno) de peor sentimiento.
+        Si department_hint (p. ej. la pregunta del GM) menciona un departamento como palabra completa,
+        prioriza sus grupos.
+        """
+        summaries = self.get_summaries()
+        groups = self.get_groups()
+        if not groups:
+            return ""
+        if department_hint:
+            hint = _strip_accents(department_hint.lower())
+            hinted = [
+                g for g in groups
+                if g["department"] != DEFAULT_DEPARTMENT
+                and re.search(rf"\b{re.escape(_strip_accents(g['department'].lower()))}\b", hint)
+            ]
+            groups = hinted or groups
+        groups = sorted(groups, key=lambda g: g["avg_polarity"])[:max_groups]
+
+        updated_at = max(s["generated_at"] for s in summaries)
+        lines = [
+            f"- {g['department']} / turno {g['shift']}: polaridad media {g['avg_polarity']:+.2f}, "
+            f"{g['negative_share']:.0%} de comentarios negativos ({g['count']} respuestas)"
+            for g in groups
+        ]
+        return (
+            f"Sentimiento medido en el feedback anónimo del equipo ({len(summaries)} archivo(s), "
+            f"actualizado {updated_at}; de peor a mejor):\n" + "\n".join(lines)
+        )
+
+
+# Ejemplo de uso: python -m src.core.sentiment_pipeline data/raw/team_feedback.csv
+if __name__ == "__main__":
+    pipeline = FeedbackSentimentPipeline()
+    for path in sys.argv[1:]:
+        result = pipeline.score_file(path, force=True)
+        print(json.dumps(result["overall"], indent=4, ensure_ascii=False))
+    print(pipeline.get_morale_context())
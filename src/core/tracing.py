@@ -0,0 +1,250 @@
+import atexit
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+
+class _NullSpan:
+    """Span vacío que se reutiliza cuando el tracing está desactivado (sin asignaciones ni lecturas de reloj)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.tracer._enter_span()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self.name, self.start, end, self.args)
+        self.tracer._exit_span()
+        return False
+
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo: cada `interval` segundos captura la pila de todos los hilos y acumula
+    conteos en formato "folded" (una pila por línea), compatible con flamegraph.pl y speedscope.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def save(self, filepath):
+        """Escribe las muestras acumuladas y las reinicia para la siguiente ejecución."""
+        samples, self.samples = self.samples, Counter()
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Tracer:
+    """
+    Tracing opcional por spans anidados alrededor de cada etapa del pipeline. Guarda los eventos en
+    formato Chrome Trace Event (JSON), que abren chrome://tracing, Perfetto y speedscope.
+    Los agentes reciben un Tracer y marcan cada etapa con un span; desactivado, `span()` retorna un
+    objeto vacío compartido y el coste es prácticamente nulo.
+    Al cerrarse el span más externo de un hilo (p. ej. una petición al copiloto o el enriquecimiento de
+    una empresa), sus eventos se escriben en un archivo propio y se liberan de memoria.
+    """
+
+    def __init__(self, enabled=False, trace_file="data/traces/trace.json", sample_interval=None):
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self._events = []
+        self._thread_names = {} # tid -> nombre, capturado al registrar el span (los hilos de Streamlit son efímeros)
+        self._local = threading.local() # Profundidad de spans abiertos en cada hilo
+        self._saves = 0
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self.profiler = SamplingProfiler(sample_interval) if enabled and sample_interval else None
+        if self.profiler:
+            self.profiler.start()
+
+    def span(self, name: str, **args):
+        """Context manager que mide una etapa: `with tracer.span("llm_enrich", company=nombre): ...`"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def _enter_span(self):
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+
+    def _exit_span(self):
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            self._save_thread(threading.get_ident())
+
+    def _record(self, name, start_ns, end_ns, args):
+        event = {
+            "name": name,
+            "ph": "X", # Evento completo: inicio + duración; el visor anida por tiempo dentro del mismo hilo
+            "ts": (start_ns - self._origin) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = {k: str(v) for k, v in args.items()}
+        with self._lock:
+            self._events.append(event)
+            self._thread_names[event["tid"]] = threading.current_thread().name
+
+    def get_events(self) -> list:
+        with self._lock:
+            return list(self._events)
+
+    def _next_trace_path(self) -> str:
+        """trace-<fecha>-<pid>-<n>.json: único por petición y sin pisar archivos de ejecuciones anteriores."""
+        with self._lock:
+            self._saves += 1
+            saves = self._saves
+        root, extension = os.path.splitext(self.trace_file)
+        return f"{root}-{time.strftime('%Y%m%d-%H%M%S')}-{self._pid}-{saves}{extension}"
+
+    def _save_thread(self, tid):
+        """Escribe y descarta los eventos de un hilo, sin tocar los spans en curso de otros hilos."""
+        with self._lock:
+            events = [e for e in self._events if e["tid"] == tid]
+            self._events = [e for e in self._events if e["tid"] != tid]
+            thread_names = {tid: self._thread_names.pop(tid)} if tid in self._thread_names else {}
+        self._write(events, thread_names)
+
+    def save(self, filepath: str = None):
+        """
+        Escribe los eventos pendientes de todos los hilos (y el perfil "folded" si el muestreo está
+        activo) y los descarta de memoria. Sin filepath, cada llamada escribe un archivo nuevo.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            events, self._events = self._events, []
+            thread_names, self._thread_names = self._thread_names, {}
+        return self._write(events, thread_names, filepath)
+
+    def _write(self, events, thread_names, filepath=None):
+        if not events and not (self.profiler and self.profiler.samples):
+            return None
+        filepath = filepath or self._next_trace_path()
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        if self.profiler:
+            self.profiler.save(f"{os.path.splitext(filepath)[0]}.folded")
+        return filepath
+
+    def close(self):
+        if self.profiler:
+            self.profiler.stop()
+        self.save()
+
+
+def traced(name: str = None, args=()):
+    """
+    Decorador para métodos de objetos con atributo `tracer`: envuelve la llamada completa en un span.
+    `args` nombra parámetros del método que se guardan como argumentos del span.
+    """
+    def decorator(func):
+        span_name = name or func.__name__
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(self, *call_args, **call_kwargs):
+            tracer = self.tracer
+            if not tracer.enabled:
+                return func(self, *call_args, **call_kwargs)
+            bound = signature.bind(self, *call_args, **call_kwargs)
+            span_args = {arg: bound.arguments.get(arg) for arg in args}
+            with _Span(tracer, span_name, span_args):
+                return func(self, *call_args, **call_kwargs)
+        return wrapper
+    return decorator
+
+
+_default_tracer = None
+_default_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Tracer compartido del proceso, configurado por variables de entorno:
+    PARADERO_TRACE_FILE (activa el tracing y define el archivo) y
+    PARADERO_PROFILE_INTERVAL (segundos entre muestras del perfilador, opcional).
+    """
+    global _default_tracer
+    if _default_tracer is None:
+        with _default_lock:
+            if _default_tracer is None:
+                trace_file = os.getenv("PARADERO_TRACE_FILE")
+                interval = os.getenv("PARADERO_PROFILE_INTERVAL")
+                try:
+                    sample_interval = float(interval) if interval else None
+                except ValueError:
+                    print(f"Advertencia: PARADERO_PROFILE_INTERVAL inválido ({interval}). Perfilado por muestreo desactivado.")
+                    sample_interval = None
+                if trace_file:
+                    _default_tracer = Tracer(True, trace_file, sample_interval)
+                    atexit.register(_default_tracer.close)
+                else:
+                    _default_tracer = Tracer(enabled=False)
+    return _default_tracer
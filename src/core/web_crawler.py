@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from src.core.prompt_budget import trim_to_token_budget
+
+
+class WebCrawler:
+    """
+    Descarga y extrae el texto de los sitios web de las empresas para "aterrizar" el enriquecimiento.
+    Usa una sesión HTTP compartida con pool de conexiones, límites de cortesía por host,
+    timeouts y una caché en disco revalidada con ETag/Last-Modified.
+    """
+
+    USER_AGENT = "ParaderoAI-SalesActivator/1.0"
+    # Etiquetas que no aportan información sobre el perfil de la empresa
+    NOISE_TAGS = ["script", "style", "noscript", "svg", "nav", "footer", "header", "form", "iframe"]
+
+    def __init__(self, cache_dir="data/cache/web/", max_workers=8, per_host_limit=2,
+                 min_host_interval=0.5, connect_timeout=3.05, read_timeout=10.0,
+                 max_tokens=800, max_bytes=2_000_000):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.min_host_interval = min_host_interval
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+
+        # Sesión compartida entre hilos: reutiliza conexiones TCP/TLS por host
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": self.USER_AGENT})
+
+        self._hosts_lock = threading.Lock()
+        self._host_semaphores = {}
+        self._host_last_request = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize_url(website: str) -> str:
+        """Añade el esquema a URLs como 'www.empresa.com' y descarta valores vacíos."""
+        if not website or not isinstance(website, str):
+            return ""
+        website = website.strip()
+        if not website:
+            return ""
+        if "://" not in website:
+            website = f"https://{website}"
+        return website
+
+    def _cache_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_cache_entry(self, url: str):
+        try:
+            with open(self._cache_path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_cache_entry(self, url: str, entry: dict):
+        # Escritura atómica para que hilos concurrentes no dejen archivos a medias
+        path = self._cache_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _host_slot(self, host: str):
+        with self._hosts_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_semaphores[host]
+
+    def _wait_for_host(self, host: str):
+        """Respeta un intervalo mínimo entre peticiones consecutivas al mismo host."""
+        with self._hosts_lock:
+            now = time.monotonic()
+            next_allowed = self._host_last_request.get(host, 0.0) + self.min_host_interval
+            start_at = max(now, next_allowed)
+            self._host_last_request[host] = start_at
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _read_limited(self, response) -> bytes:
+        """Lee el cuerpo de la respuesta sin superar max_bytes."""
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=65536):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                break
+        return b"".join(chunks)[:self.max_bytes]
+
+    def extract_text(self, html) -> str:
+        """Extrae título, meta descripción y texto visible de una página HTML."""
+        soup = BeautifulSoup(html, "html.parser")
+        for tag in soup(self.NOISE_TAGS):
+            tag.decompose()
+
+        parts = []
+        if soup.title and soup.title.string:
+            parts.append(soup.title.string.strip())
+        meta = soup.find("meta", attrs={"name": "description"})
+        if meta and meta.get("content"):
+            parts.append(meta["content"].strip())
+        body = soup.body or soup
+        parts.append(body.get_text(separator=" ", strip=True))
+        return " ".join(" ".join(p for p in parts if p).split())
+
+    def fetch(self, website: str) -> str:
+        """
+        Obtiene el texto extraído de un sitio web, usando la caché en disco cuando el servidor
+        responde 304 Not Modified. Retorna una cadena vacía si la descarga falla.
+        """
+        url = self.normalize_url(website)
+        if not url:
+            return ""
+        host = urlparse(url).netloc.lower()
+        cached = self._load_cache_entry(url)
+
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            with self._host_slot(host):
+                self._wait_for_host(host)
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+                try:
+                    if response.status_code == 304:
+                        # Sin entrada en caché un 304 no trae contenido: no se guarda nada
+                        return cached.get("text", "") if cached else ""
+                    response.raise_for_status()
+                    content_type = response.headers.get("Content-Type", "")
+                    if content_type and "html" not in content_type.lower():
+                        print(f"Advertencia: {url} no devolvió HTML ({content_type}). Omitiendo.")
+                        return ""
+                    raw = self._read_limited(response)
+                finally:
+                    response.close()
+        except requests.RequestException as e:
+            print(f"Advertencia: No se pudo descargar {url}: {e}")
+            # Si hay una copia previa, es mejor que nada
+            return cached.get("text", "") if cached else ""
+
+        # Sin charset en las cabeceras, BeautifulSoup detecta la codificación a partir de los bytes
+        if "charset=" in content_type.lower() and response.encoding:
+            text = self.extract_text(raw.decode(response.encoding, errors="replace"))
+        else:
+            text = self.extract_text(raw)
+        self._save_cache_entry(url, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+            "text": text,
+        })
+        return text
+
+    def fetch_many(self, websites) -> dict:
+        """Descarga varios sitios en paralelo. Retorna {website original: texto extraído}."""
+        unique_sites = [w for w in dict.fromkeys(websites) if self.normalize_url(w)]
+        if not unique_sites:
+            return {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            texts = executor.map(self.fetch, unique_sites)
+            return dict(zip(unique_sites, texts))
+
+    def get_context(self, website: str, max_tokens: int = None) -> str:
+        """Texto del sitio recortado al presupuesto de tokens, listo para el prompt."""
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        return trim_to_token_budget(self.fetch(website), budget)
+
+    def get_contexts(self, websites, max_tokens: int = None) -> dict:
+        """Versión concurrente de get_context para procesamiento en lote."""
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        return {site: trim_to_token_budget(text, budget) for site, text in self.fetch_many(websites).items()}
+
+    def close(self):
+        self.session.close()
@@ -2,11 +2,15 @@ import streamlit as st
 import pandas as pd
 import json
 import os
+import uuid
 
 # módulos del proyecto
 from src.core.llm_handler import LLMHandler
 from src.copilot.gm_copilot import GMCopilot
+from src.core.sentiment_pipeline import FeedbackSentimentPipeline
 from src.agents.sales_activator import SalesActivatorAgent 
+from src.core.web_crawler import WebCrawler
+from src.core.tracing import get_tracer
 
 # --- Configuración de la página de Streamlit ---
 st.set_page_config(page_title="Paradero AI - Centro de Operaciones", layout="wide", initial_sidebar_state="expanded")
@@ -19,11 +23,19 @@ if "llm_handler" not in st.session_state:
         st.error(f"Error de configuración: {e}. Asegúrate de que OPENAI_API_KEY esté en tu archivo .env")
         st.stop()
 
+if "copilot_session_id" not in st.session_state:
+    st.session_state.copilot_session_id = str(uuid.uuid4())
+
 if "gm_copilot" not in st.session_state:
-    st.session_state.gm_copilot = GMCopilot(st.session_state.llm_handler)
+    st.session_state.gm_copilot = GMCopilot(st.session_state.llm_handler, FeedbackSentimentPipeline())
+
+@st.cache_resource
+def get_web_crawler():
+    """Un solo crawler por proceso: todas las sesiones comparten el pool HTTP y los límites por host."""
+    return WebCrawler()
 
 if "sales_agent" not in st.session_state:
-    st.session_state.sales_agent = SalesActivatorAgent(st.session_state.llm_handler)
+    st.session_state.sales_agent = SalesActivatorAgent(st.session_state.llm_handler, get_web_crawler())
 
 # --- Funciones Auxiliares para cargar/guardar datos del SalesActivator ---
 # Estas funciones simulan una base de datos para el agente
@@ -65,10 +77,14 @@ if page_selection == "🤖 Copiloto GM":
     if st.button("Obtener Recomendación del Copiloto"):
         if gm_question:
             with st.spinner("Paradero AI está pensando..."):
-                recommendation, suggested_action = st.session_state.gm_copilot.get_recommendation(gm_question)
+                recommendation, suggested_action = st.session_state.gm_copilot.get_recommendation(
+                    gm_question, session_id=st.session_state.copilot_session_id
+                )
 
             st.subheader("💡 Recomendación de Paradero AI:")
             st.write(recommendation)
+            report = st.session_state.gm_copilot.last_prompt_report
+            st.caption(f"Prompt: ~{report['total_prompt_tokens']} tokens ({report['history_messages']} mensajes de historial)")
 
             if suggested_action:
                 st.markdown("---")
@@ -106,7 +122,8 @@ elif page_selection == "📈 Agente SalesActivator":
 
     if uploaded_file is not None:
         try:
-            df_uploaded = pd.read_csv(uploaded_file)
+            with get_tracer().span("parse_csv", file=uploaded_file.name):
+                df_uploaded = pd.read_csv(uploaded_file)
             st.write("Vista previa del CSV cargado:")
             st.dataframe(df_uploaded.head())
 
@@ -125,6 +142,16 @@ elif page_selection == "📈 Agente SalesActivator":
                     progress_text = st.empty()
                     progress_bar = st.progress(0)
 
+                    # Descarga concurrente de los sitios web antes de las llamadas al LLM, solo para
+                    # filas con nombre que aún no fueron procesadas (evita volver a rastrear en cada recarga)
+                    processed_names = {c['name'].lower() for c in st.session_state.sales_agent._load_data()}
+                    pending_websites = [
+                        c.get('website') for c in companies_to_process
+                        if isinstance(c.get('name'), str) and c['name'].lower() not in processed_names
+                    ]
+                    progress_text.text("Descargando sitios web de las empresas...")
+                    website_contexts = st.session_state.sales_agent.fetch_website_contexts(pending_websites)
+
                     for i, company_data in enumerate(companies_to_process):
                         company_name = company_data.get('name')
                         company_website = company_data.get('website', '') # 'website' es opcional
@@ -132,7 +159,7 @@ elif page_selection == "📈 Agente SalesActivator":
                         if company_name:
                             progress_text.text(f"Procesando empresa {i+1}/{total_companies}: {company_name}...")
                             success, message = st.session_state.sales_agent.process_new_company(
-                                company_name, company_website
+                                company_name, company_website, website_contexts.get(company_website)
                             )
                             if success:
                                 st.success(f"✔️ {company_name}: {message}")
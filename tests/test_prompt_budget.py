@@ -0,0 +1,123 @@
+import unittest
+import os
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.prompt_budget import ConversationMemory, PromptAssembler, estimate_tokens, trim_to_token_budget
+from src.core.llm_handler import LLMHandler
+from src.copilot.gm_copilot import GMCopilot
+
+LONG_ANSWER = "Recomendamos revisar los turnos del equipo. " + "Detalle operativo adicional del plan. " * 10
+# Respuesta realista del copiloto: ~1.440 tokens, casi todo el presupuesto de historial por defecto
+REALISTIC_ANSWER = "Sugerimos reforzar el turno de noche. " + "Detalle operativo adicional del plan. " * 130
+
+
+class TestPromptBudget(unittest.TestCase):
+
+    def test_estimate_tokens(self):
+        """La estimación crece con el texto y cuenta palabras largas como varios tokens."""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("hola, GM"), 3)
+        self.assertGreater(estimate_tokens("hospitalidad"), estimate_tokens("hotel"))
+
+    def test_trim_to_token_budget_respects_budget(self):
+        """El recorte respeta el presupuesto, incluida la elipsis, y no modifica textos que ya caben."""
+        text = "El huésped solicitó un upgrade de habitación. " * 100
+        trimmed = trim_to_token_budget(text, 30)
+        self.assertLessEqual(estimate_tokens(trimmed), 30)
+        self.assertTrue(trimmed.endswith("..."))
+        self.assertEqual(trim_to_token_budget("corto", 50), "corto")
+        for budget in (1, 3, 7, 50):
+            self.assertLessEqual(estimate_tokens(trim_to_token_budget(text, budget)), budget)
+
+    def test_memory_compacts_old_turns_within_budget(self):
+        """El historial nunca supera el presupuesto: los turnos antiguos pasan al resumen."""
+        memory = ConversationMemory(max_history_tokens=400, summary_tokens=120)
+        for i in range(10):
+            memory.add_turn("s1", f"Pregunta de seguimiento número {i}", LONG_ANSWER)
+
+        messages = memory.get_messages("s1")
+        self.assertLessEqual(sum(estimate_tokens(m["content"]) for m in messages), 400)
+        self.assertEqual(messages[0]["role"], "system")
+        self.assertIn("Pregunta de seguimiento número", messages[0]["content"])
+        self.assertIn("Recomendamos revisar los turnos del equipo.", messages[0]["content"])
+        self.assertNotIn("número 0", " ".join(m["content"] for m in messages)) # Fuera del presupuesto del resumen
+        self.assertEqual(messages[-2], {"role": "user", "content": "Pregunta de seguimiento número 9"})
+        self.assertEqual(memory.get_messages("otra_sesion"), [])
+
+    def test_memory_keeps_every_turn_with_realistic_answers(self):
+        """Con respuestas largas ningún turno desaparece: lo que no cabe completo queda en el resumen."""
+        self.assertGreater(estimate_tokens(REALISTIC_ANSWER), 1400)
+        memory = ConversationMemory()
+        questions = [f"Consulta {name} sobre el turno de noche" for name in ("uno", "dos", "tres")]
+        for question in questions:
+            memory.add_turn("s1", question, REALISTIC_ANSWER)
+            messages = memory.get_messages("s1")
+            self.assertLessEqual(sum(estimate_tokens(m["content"]) for m in messages), memory.max_history_tokens)
+            self.assertEqual(messages[-2]["content"], question) # El turno más nuevo siempre va completo
+
+        content = " ".join(m["content"] for m in messages)
+        for question in questions:
+            self.assertIn(question, content)
+
+        # Con un presupuesto menor el turno más nuevo también pasa al resumen, sin perderse
+        messages = memory.get_messages("s1", max_tokens=200)
+        self.assertEqual(len(messages), 1)
+        self.assertIn("Consulta tres", messages[0]["content"].splitlines()[-1])
+
+        # Una respuesta mayor que todo el presupuesto se recorta en lugar de vaciar el historial
+        memory.add_turn("s2", "¿Plan para el verano?", REALISTIC_ANSWER * 2)
+        messages = memory.get_messages("s2")
+        self.assertEqual(messages[0], {"role": "user", "content": "¿Plan para el verano?"})
+        self.assertTrue(messages[1]["content"].endswith("..."))
+
+    def test_assembler_keeps_static_prefix_first(self):
+        """El prefijo estático no cambia entre preguntas y el reporte suma todas las secciones."""
+        assembler = PromptAssembler(["Rol del copiloto.", "SOPs de Paradero y Tono:\nExcelencia."])
+        first, _, report = assembler.build("¿Pregunta A?", "\nContexto A")
+        second, _, _ = assembler.build("¿Pregunta B?", "\nContexto B")
+
+        self.assertTrue(first.startswith(assembler.static_prefix))
+        self.assertTrue(second.startswith(assembler.static_prefix))
+        self.assertEqual(
+            report["total_prompt_tokens"],
+            report["static_prefix_tokens"] + report["dynamic_context_tokens"]
+            + report["history_tokens"] + report["question_tokens"]
+        )
+
+    def test_copilot_sends_session_history(self):
+        """Las preguntas de seguimiento de una sesión incluyen el historial; sin sesión no hay historial."""
+        llm_handler = MagicMock()
+        llm_handler.get_completion.return_value = "Sugerimos un check-in express."
+        copilot = GMCopilot(llm_handler)
+
+        copilot.get_recommendation("¿Cómo agilizo el check-in?", session_id="gm-1")
+        self.assertEqual(llm_handler.get_completion.call_args.kwargs["history"], [])
+
+        copilot.get_recommendation("¿Y en horas pico?", session_id="gm-1")
+        history = llm_handler.get_completion.call_args.kwargs["history"]
+        self.assertEqual(history[0], {"role": "user", "content": "¿Cómo agilizo el check-in?"})
+        self.assertEqual(copilot.last_prompt_report["history_messages"], 2)
+
+        copilot.get_recommendation("Pregunta aislada")
+        self.assertEqual(llm_handler.get_completion.call_args.kwargs["history"], [])
+
+
+    def test_copilot_does_not_store_failed_completions(self):
+        """Si el LLM falla, la respuesta de error no entra en el historial de la sesión."""
+        llm_handler = MagicMock()
+        llm_handler.get_completion.return_value = LLMHandler.ERROR_RESPONSE
+        copilot = GMCopilot(llm_handler)
+
+        copilot.get_recommendation("¿Cómo agilizo el check-in?", session_id="gm-1")
+        llm_handler.get_completion.return_value = "Sugerimos un check-in express."
+        copilot.get_recommendation("¿Y en horas pico?", session_id="gm-1")
+
+        self.assertEqual(llm_handler.get_completion.call_args.kwargs["history"], [])
+        self.assertEqual(len(copilot.conversation_memory.get_messages("gm-1")), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import os
+from unittest.mock import MagicMock
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.sales_activator import SalesActivatorAgent
+
+LLM_JSON = (
+    '{"name": "Eventos Andinos", "industry_segment": "Pharma MICE", "key_contacts": "Event Manager", '
+    '"potential_needs": "Salones para congresos", "pain_point": "Poca flexibilidad"}'
+)
+
+
+class TestSalesEnrichmentWithWebsite(unittest.TestCase):
+
+    def setUp(self):
+        self.llm_handler = MagicMock()
+        self.llm_handler.get_completion.return_value = LLM_JSON
+        self.web_crawler = MagicMock()
+        self.web_crawler.get_context.return_value = "Organizadores de congresos médicos en Bogotá."
+        self.agent = SalesActivatorAgent(self.llm_handler, self.web_crawler)
+
+    def test_enrichment_prompt_includes_website_text(self):
+        """Sin contexto previo, el agente descarga el sitio y lo incluye en el prompt de enriquecimiento."""
+        enriched = self.agent.enrich_company_data("Eventos Andinos", "www.eventosandinos.com")
+
+        self.assertEqual(enriched["industry_segment"], "Pharma MICE")
+        self.web_crawler.get_context.assert_called_once_with("www.eventosandinos.com")
+        user_prompt = self.llm_handler.get_completion.call_args.kwargs["user_prompt"]
+        self.assertIn("Organizadores de congresos médicos en Bogotá.", user_prompt)
+
+    def test_prefetched_context_is_not_fetched_again(self):
+        """Un contexto ya descargado (incluso vacío) se usa tal cual, sin otra descarga."""
+        self.agent.enrich_company_data("Eventos Andinos", "www.eventosandinos.com", website_context="")
+        self.agent.enrich_company_data("Eventos Andinos", "www.eventosandinos.com", website_context="Texto previo.")
+
+        self.web_crawler.get_context.assert_not_called()
+        user_prompt = self.llm_handler.get_completion.call_args.kwargs["user_prompt"]
+        self.assertIn("Texto previo.", user_prompt)
+
+    def test_fetch_website_contexts_delegates_to_crawler(self):
+        self.web_crawler.get_contexts.return_value = {"www.a.com": "A"}
+        self.assertEqual(self.agent.fetch_website_contexts(["www.a.com"]), {"www.a.com": "A"})
+        self.assertEqual(SalesActivatorAgent(self.llm_handler).fetch_website_contexts(["www.a.com"]), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
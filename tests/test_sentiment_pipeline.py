@@ -0,0 +1,180 @@
+import unittest
+import csv
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.sentiment_pipeline import FeedbackSentimentPipeline, spanish_sentiment
+from src.copilot.gm_copilot import GMCopilot
+
+FEEDBACK_ROWS = [
+    ("Housekeeping", "Noche", "Pésimo ambiente, horarios horribles, estamos agotados…"),
+    ("Housekeeping", "Noche", "Nos sentimos ignorados y sin apoyo del supervisor."),
+    ("Housekeeping", "Mañana", "Buen equipo, contentos con el apoyo."),
+    ("Cocina", "Tarde", "Excelente chef, muy contentos y con reconocimiento constante."),
+    ("Cocina", "Tarde", ""), # Las filas sin texto se omiten
+]
+
+
+class TestFeedbackSentimentPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.feedback_file = os.path.join(self.tmp_dir, "feedback.csv")
+        with open(self.feedback_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Departamento", "Turno", "Comentario"])
+            writer.writerows(FEEDBACK_ROWS)
+        self.pipeline = FeedbackSentimentPipeline(
+            summary_file=os.path.join(self.tmp_dir, "summary.json"), batch_size=2, max_workers=2
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_score_file_aggregates_by_department_and_shift(self):
+        """Agrega el sentimiento por departamento y turno usando el pool de procesos."""
+        summary = self.pipeline.score_file(self.feedback_file)
+        groups = {(g["department"], g["shift"]): g for g in summary["groups"]}
+
+        self.assertEqual(summary["overall"]["count"], 4)
+        self.assertEqual(groups[("Housekeeping", "Noche")]["count"], 2)
+        self.assertLess(groups[("Housekeeping", "Noche")]["avg_polarity"], 0)
+        self.assertEqual(groups[("Housekeeping", "Noche")]["negative_share"], 1.0)
+        self.assertGreater(groups[("Cocina", "Tarde")]["avg_polarity"], 0)
+
+        with open(self.pipeline.summary_file, 'r', encoding='utf-8') as f:
+            self.assertIn(os.path.abspath(self.feedback_file), json.load(f))
+
+    def test_spanish_feedback_is_scored(self):
+        """El analizador por defecto entiende español, incluida la negación."""
+        self.assertLess(spanish_sentiment("Pésimo ambiente, horarios horribles, estamos agotados…")[0], -0.5)
+        self.assertGreater(spanish_sentiment("Excelente equipo, muy contentos con el apoyo.")[0], 0.5)
+        self.assertLess(spanish_sentiment("No estoy contento con los turnos.")[0], 0)
+        self.assertEqual(spanish_sentiment("Hoy hubo reunión a las ocho."), (0.0, 0.0))
+        # Superlativos y diminutivos se reducen a su raíz; las raíces cortas exigen la palabra exacta
+        self.assertLess(spanish_sentiment("El turno de noche está malísimo.")[0], -0.6)
+        self.assertGreater(spanish_sentiment("Un equipo buenísimo.")[0], 0.6)
+        self.assertLess(spanish_sentiment("Estamos cansadísimos.")[0], 0)
+        self.assertGreater(spanish_sentiment("Todos contentitos con el cambio.")[0], 0)
+        self.assertEqual(spanish_sentiment("Perdí mi maleta."), (0.0, 0.0))
+
+    def test_english_analyzer_is_configurable(self):
+        """Con language="en" se usa TextBlob; un idioma desconocido se rechaza."""
+        english_file = os.path.join(self.tmp_dir, "feedback_en.txt")
+        with open(english_file, 'w', encoding='utf-8') as f:
+            f.write("The workload is terrible and the schedule is awful.\n")
+        pipeline = FeedbackSentimentPipeline(summary_file=self.pipeline.summary_file, max_workers=1, language="en")
+        summary = pipeline.score_file(english_file)
+        self.assertEqual(summary["language"], "en")
+        self.assertLess(summary["overall"]["avg_polarity"], 0)
+        with self.assertRaises(ValueError):
+            FeedbackSentimentPipeline(language="fr")
+
+    def test_score_file_reuses_cached_summary(self):
+        """Un archivo sin cambios no se vuelve a puntuar."""
+        first = self.pipeline.score_file(self.feedback_file)
+        with patch.object(self.pipeline, "_score_batches") as mock_score:
+            second = self.pipeline.score_file(self.feedback_file)
+            mock_score.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_excel_exports_with_bom_or_latin1_are_read(self):
+        """Un CSV con BOM conserva sus columnas y uno en Windows-1252/Latin-1 se relee sin fallar."""
+        for name, encoding in (("feedback_bom.csv", "utf-8-sig"), ("feedback_latin1.csv", "cp1252")):
+            filepath = os.path.join(self.tmp_dir, name)
+            with open(filepath, 'w', encoding=encoding, newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["Departamento", "Turno", "Comentario"])
+                writer.writerow(["Recepción", "Mañana", "Pésimo turno, estamos agotados."])
+            with patch("builtins.print") as mock_print:
+                summary = self.pipeline.score_file(filepath)
+            self.assertEqual((summary["groups"][0]["department"], summary["groups"][0]["shift"]), ("Recepción", "Mañana"))
+            self.assertLess(summary["overall"]["avg_polarity"], 0)
+            self.assertEqual(mock_print.called, encoding == "cp1252") # Solo el fallback lo advierte
+
+    def test_jsonl_input_in_single_process(self):
+        """Soporta exports JSONL y la ejecución sin pool (max_workers=1)."""
+        jsonl_file = os.path.join(self.tmp_dir, "notas_1a1.jsonl")
+        with open(jsonl_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"department": "Front Desk", "shift": "Noche", "text": "Estoy muy feliz aquí."}) + "\n")
+            f.write("no es json\n")
+        pipeline = FeedbackSentimentPipeline(summary_file=self.pipeline.summary_file, max_workers=1)
+        summary = pipeline.score_file(jsonl_file)
+        self.assertEqual(summary["overall"]["count"], 1)
+        self.assertEqual(summary["groups"][0]["department"], "Front Desk")
+
+    def test_morale_context_prioritizes_mentioned_department(self):
+        """El contexto para el copiloto lista primero los grupos con peor sentimiento."""
+        self.pipeline.score_file(self.feedback_file)
+
+        context = self.pipeline.get_morale_context()
+        self.assertLess(context.index("Housekeeping / turno Noche"), context.index("Cocina"))
+
+        context = self.pipeline.get_morale_context("¿Cómo está la moral en cocina?")
+        self.assertIn("Cocina", context)
+        self.assertNotIn("Housekeeping", context)
+
+    def test_morale_context_hint_matches_whole_words(self):
+        """'Gerente General' no selecciona el grupo por defecto 'General', ni 'Cocina' coincide con 'cocinar'."""
+        general_file = os.path.join(self.tmp_dir, "notas.txt")
+        with open(general_file, 'w', encoding='utf-8') as f:
+            f.write("Excelente semana.\n")
+        self.pipeline.score_file(self.feedback_file)
+        self.pipeline.score_file(general_file)
+
+        context = self.pipeline.get_morale_context("Como Gerente General, ¿cómo va el equipo?")
+        self.assertIn("Housekeeping", context)
+        context = self.pipeline.get_morale_context("¿Hay que cocinar más rápido?")
+        self.assertIn("Housekeeping", context)
+
+    def test_morale_context_merges_sources_and_drops_deleted_files(self):
+        """Varios exports del mismo grupo dan una sola línea; los archivos borrados dejan de contar."""
+        second_file = os.path.join(self.tmp_dir, "feedback_feb.csv")
+        with open(second_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Departamento", "Turno", "Comentario"])
+            writer.writerow(["Cocina", "Tarde", "Pésimo turno, estamos agotados."])
+        self.pipeline.score_file(self.feedback_file)
+        self.pipeline.score_file(second_file)
+
+        context = self.pipeline.get_morale_context()
+        self.assertEqual(context.count("Cocina / turno Tarde"), 1)
+        self.assertIn("(2 respuestas)", context.split("Cocina / turno Tarde")[1].splitlines()[0])
+        self.assertIn("2 archivo(s), actualizado", context)
+
+        # Los grupos se combinan con los totales sin redondear de cada archivo
+        texts = [text for department, shift, text in FEEDBACK_ROWS if department == "Cocina" and text]
+        texts.append("Pésimo turno, estamos agotados.")
+        cocina = next(g for g in self.pipeline.get_groups() if g["department"] == "Cocina")
+        self.assertAlmostEqual(cocina["polarity_sum"], sum(spanish_sentiment(t)[0] for t in texts))
+        self.assertEqual(cocina["avg_polarity"], round(sum(spanish_sentiment(t)[0] for t in texts) / 2, 3))
+        self.assertEqual(cocina["negatives"], 1)
+
+        os.remove(second_file)
+        context = self.pipeline.get_morale_context()
+        self.assertIn("1 archivo(s)", context)
+        self.assertIn("(1 respuestas)", context.split("Cocina / turno Tarde")[1].splitlines()[0])
+
+    def test_copilot_injects_cached_sentiment(self):
+        """El copiloto añade el sentimiento medido al prompt en preguntas de moral, sin puntuar de nuevo."""
+        self.pipeline.score_file(self.feedback_file)
+        llm_handler = MagicMock()
+        llm_handler.get_completion.return_value = "Recomendamos una reunión de equipo."
+        copilot = GMCopilot(llm_handler, self.pipeline)
+
+        with patch.object(self.pipeline, "_score_batches") as mock_score:
+            copilot.get_recommendation("¿Cómo mejoro la moral del equipo?")
+            mock_score.assert_not_called()
+
+        system_prompt = llm_handler.get_completion.call_args.kwargs["system_prompt"]
+        self.assertIn("Housekeeping / turno Noche", system_prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
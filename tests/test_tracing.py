@@ -0,0 +1,162 @@
+import unittest
+import glob
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core import tracing
+from src.core.tracing import Tracer
+from src.copilot.gm_copilot import GMCopilot
+from src.agents.sales_activator import SalesActivatorAgent
+
+LLM_JSON = (
+    '{"name": "Eventos Andinos", "industry_segment": "Pharma MICE", "key_contacts": "Event Manager", '
+    '"potential_needs": "Salones para congresos", "pain_point": "Poca flexibilidad"}'
+)
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.trace_file = os.path.join(self.tmp_dir, "trace.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _saved_events(self, phase="X"):
+        """Eventos de todos los archivos de traza escritos, en orden de escritura."""
+        paths = sorted(glob.glob(os.path.join(self.tmp_dir, "trace-*.json")), key=lambda p: int(p.rsplit("-", 1)[1][:-5]))
+        events = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                events.extend(e for e in json.load(f)["traceEvents"] if e["ph"] == phase)
+        return events
+
+    def test_disabled_tracer_records_nothing(self):
+        """Desactivado, el span es un objeto compartido y no se escribe ningún archivo."""
+        tracer = Tracer(enabled=False, trace_file=self.trace_file)
+        self.assertIs(tracer.span("a"), tracer.span("b"))
+        with tracer.span("etapa"):
+            pass
+        tracer.save()
+        self.assertEqual(tracer.get_events(), [])
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_nested_spans_are_saved_as_chrome_trace(self):
+        """Los spans anidados quedan contenidos en el tiempo de su padre, en formato Chrome Trace Event."""
+        tracer = Tracer(enabled=True, trace_file=self.trace_file)
+        with tracer.span("process_new_company", company="Acme"):
+            with tracer.span("llm_enrich"):
+                time.sleep(0.01)
+        with self.assertRaises(ValueError):
+            with tracer.span("extract_json"):
+                raise ValueError("JSON inválido")
+
+        events = {e["name"]: e for e in self._saved_events()}
+        parent, child = events["process_new_company"], events["llm_enrich"]
+        self.assertEqual(parent["args"], {"company": "Acme"})
+        self.assertGreaterEqual(child["dur"], 10_000) # microsegundos
+        self.assertGreaterEqual(child["ts"], parent["ts"])
+        self.assertLessEqual(child["ts"] + child["dur"], parent["ts"] + parent["dur"])
+        self.assertEqual(events["extract_json"]["args"]["error"], "ValueError")
+
+    def test_sampling_profiler_writes_folded_stacks(self):
+        """Con muestreo activo se genera un archivo .folded junto a la traza."""
+        tracer = Tracer(enabled=True, trace_file=self.trace_file, sample_interval=0.001)
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        tracer.close()
+
+        folded_files = glob.glob(os.path.join(self.tmp_dir, "trace-*.folded"))
+        self.assertEqual(len(folded_files), 1)
+        with open(folded_files[0], 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+        self.assertTrue(any("test_sampling_profiler_writes_folded_stacks" in line for line in lines))
+
+    def test_outermost_span_flushes_its_own_file(self):
+        """Al cerrarse el span externo de un hilo se escribe un archivo nuevo, sin tocar los spans en curso de otros hilos."""
+        tracer = Tracer(enabled=True, trace_file=self.trace_file)
+        inner_closed, request_done = threading.Event(), threading.Event()
+
+        def long_request():
+            with tracer.span("peticion_en_curso"):
+                with tracer.span("etapa_terminada"):
+                    pass
+                inner_closed.set()
+                request_done.wait(5)
+
+        worker = threading.Thread(target=long_request, name="ScriptRunner.scriptThread")
+        worker.start()
+        inner_closed.wait(5)
+        with tracer.span("primera_peticion"):
+            pass
+
+        # Solo se escribió la petición terminada; la etapa del otro hilo sigue pendiente en memoria
+        self.assertEqual([e["name"] for e in self._saved_events()], ["primera_peticion"])
+        self.assertEqual([e["name"] for e in tracer.get_events()], ["etapa_terminada"])
+
+        request_done.set()
+        worker.join()
+        self.assertEqual(tracer.get_events(), [])
+        self.assertIsNone(tracer.save()) # Sin eventos pendientes no se escribe nada
+
+        paths = glob.glob(os.path.join(self.tmp_dir, "trace-*.json"))
+        self.assertEqual(len(paths), 2)
+        self.assertTrue(all(f"-{os.getpid()}-" in os.path.basename(p) for p in paths)) # Reinicios no pisan trazas
+        self.assertEqual([e["name"] for e in self._saved_events()][1:], ["etapa_terminada", "peticion_en_curso"])
+        # El nombre del hilo se conserva aunque el hilo ya haya terminado
+        self.assertIn("ScriptRunner.scriptThread", [e["args"]["name"] for e in self._saved_events("M")])
+
+    def test_invalid_profile_interval_disables_sampling(self):
+        """Un PARADERO_PROFILE_INTERVAL inválido no rompe la creación de agentes: se desactiva el muestreo."""
+        env = {"PARADERO_TRACE_FILE": self.trace_file, "PARADERO_PROFILE_INTERVAL": "rápido"}
+        with patch.dict(os.environ, env), patch.object(tracing, "_default_tracer", None), \
+                patch.object(tracing.atexit, "register"):
+            tracer = tracing.get_tracer()
+        self.assertTrue(tracer.enabled)
+        self.assertIsNone(tracer.profiler)
+
+    def test_sales_activator_stages_nest_in_process_new_company(self):
+        """Cada etapa del SalesActivator queda registrada dentro del span de process_new_company."""
+        tracer = Tracer(enabled=True, trace_file=self.trace_file)
+        llm_handler = MagicMock()
+        llm_handler.get_completion.side_effect = [LLM_JSON, "Email 1, Email 2, Email 3"]
+        agent = SalesActivatorAgent(llm_handler, tracer=tracer)
+        agent.data_file = os.path.join(self.tmp_dir, "enriched_companies.json")
+
+        success, _ = agent.process_new_company("Eventos Andinos")
+        self.assertTrue(success)
+
+        events = {e["name"]: e for e in self._saved_events()}
+        parent = events["process_new_company"]
+        self.assertEqual(parent["args"], {"company_name": "Eventos Andinos"})
+        for stage in ("load_data", "dedup_scan", "llm_enrich", "extract_json", "llm_sequences", "save_data"):
+            child = events[stage]
+            self.assertGreaterEqual(child["ts"], parent["ts"])
+            self.assertLessEqual(child["ts"] + child["dur"], parent["ts"] + parent["dur"])
+
+    def test_copilot_stages_are_traced(self):
+        """El copiloto registra cada etapa dentro del span de la petición."""
+        tracer = Tracer(enabled=True, trace_file=self.trace_file)
+        llm_handler = MagicMock()
+        llm_handler.get_completion.return_value = "Sugerimos revisar las tarifas."
+        GMCopilot(llm_handler, tracer=tracer).get_recommendation("¿Cómo subo la ocupación?")
+
+        names = [e["name"] for e in self._saved_events()]
+        for stage in ("get_recommendation", "build_prompt", "llm_completion", "suggest_action"):
+            self.assertIn(stage, names)
+
+
+if __name__ == '__main__':
+    unittest.main()
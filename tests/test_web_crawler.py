@@ -0,0 +1,118 @@
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.prompt_budget import estimate_tokens
+from src.core.web_crawler import WebCrawler
+
+PAGE_HTML = """<html><head><title>Eventos Andinos</title>
+<meta name="description" content="Organizadores de congresos médicos en Bogotá.">
+<script>var tracking = 1;</script></head>
+<body><nav>Inicio | Contacto</nav><h1>Congresos y viajes de incentivo</h1>
+<p>Más de 200 eventos corporativos al año para la industria farmacéutica.</p>
+<footer>Copyright</footer></body></html>"""
+
+ETAG = '"v1"'
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """Servidor HTTP local que simula el sitio web de una empresa."""
+    request_log = []
+
+    def do_GET(self):
+        _SiteHandler.request_log.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.path == "/not-modified" or self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE_HTML.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Silenciar el log de cada petición durante las pruebas
+
+
+class TestWebCrawler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _SiteHandler.request_log = []
+        self.cache_dir = tempfile.mkdtemp()
+        self.crawler = WebCrawler(cache_dir=self.cache_dir, min_host_interval=0.0)
+
+    def tearDown(self):
+        self.crawler.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_fetch_extracts_visible_text(self):
+        """Verifica que se extrae título, meta descripción y texto, sin scripts ni navegación."""
+        text = self.crawler.fetch(f"{self.base_url}/")
+        self.assertIn("Eventos Andinos", text)
+        self.assertIn("congresos médicos", text)
+        self.assertIn("industria farmacéutica", text)
+        self.assertNotIn("tracking", text)
+        self.assertNotIn("Contacto", text)
+
+    def test_fetch_revalidates_cache_with_etag(self):
+        """La segunda descarga envía If-None-Match y reutiliza el texto cacheado tras un 304."""
+        first = self.crawler.fetch(f"{self.base_url}/")
+        second = self.crawler.fetch(f"{self.base_url}/")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(_SiteHandler.request_log), 2)
+        self.assertIsNone(_SiteHandler.request_log[0][1])
+        self.assertEqual(_SiteHandler.request_log[1][1], ETAG)
+
+    def test_fetch_failure_returns_empty_text(self):
+        """Un error HTTP no interrumpe el enriquecimiento: retorna texto vacío."""
+        self.assertEqual(self.crawler.fetch(f"{self.base_url}/missing"), "")
+        self.assertEqual(self.crawler.fetch(""), "")
+
+    def test_not_modified_without_cache_is_not_cached(self):
+        """Un 304 sin entrada previa en caché retorna texto vacío y no escribe en la caché."""
+        self.assertEqual(self.crawler.fetch(f"{self.base_url}/not-modified"), "")
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_fetch_many_concurrently(self):
+        """Descarga varias páginas en paralelo y las asocia a su website original."""
+        sites = [f"{self.base_url}/empresa{i}" for i in range(5)]
+        contexts = self.crawler.get_contexts(sites + [None, ""], max_tokens=5)
+
+        self.assertEqual(set(contexts), set(sites))
+        for text in contexts.values():
+            self.assertLessEqual(estimate_tokens(text), 5)
+
+    def test_normalize_url(self):
+        self.assertEqual(WebCrawler.normalize_url("www.eventoscorp.com"), "https://www.eventoscorp.com")
+        self.assertEqual(WebCrawler.normalize_url("http://a.com"), "http://a.com")
+        self.assertEqual(WebCrawler.normalize_url(float("nan")), "")
+
+
+if __name__ == '__main__':
+    unittest.main()